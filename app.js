@@ -3840,8 +3840,8 @@ function renderScores(analysis){
 
 // -------------------- Online lobby/match --------------------
 
-async function onlineApiGet(path){
-  const res = await fetch(path, {cache:"no-store"});
+async function onlineApiGet(path, cacheMode="no-store"){
+  const res = await fetch(path, {cache:cacheMode});
   let payload = null;
   try{ payload = await res.json(); }catch(_err){ payload = null; }
   if(!res.ok || !payload?.ok){
@@ -3968,7 +3968,7 @@ async function onlinePoll(force=false){
 
   state.online.pollBusy = true;
   try{
-    const lobby = await onlineApiGet(`/api/lobby?token=${encodeURIComponent(state.online.token)}`);
+    const lobby = await onlineApiGet(`/api/lobby?token=${encodeURIComponent(state.online.token)}`, "no-cache");
     state.online.lobby = lobby;
 
     const hasMatchContext = !!(lobby.current_match_id || lobby.last_match_id);
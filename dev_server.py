@@ -26,28 +26,53 @@ Endpoints:
 from __future__ import annotations
 
 import argparse
-import copy
+import email.utils
+import gzip
+import heapq
 import json
+import os
+import queue
 import random
 import secrets
 import threading
 import time
+from array import array
+from bisect import insort
+from collections import OrderedDict
+from datetime import timezone
+from functools import lru_cache
 from http import HTTPStatus
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from tempfile import NamedTemporaryFile
-from urllib.parse import parse_qs, urlparse
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib json module is used when orjson is missing
+    orjson = None
 
 ROOT = Path(__file__).resolve().parent
 OVERRIDES_FILE = ROOT / "everrides.json"
 TILESET_FILE = ROOT / "carcassonne_base_A-X.json"
+# Path -> str conversions used per request, done once.
+_ROOT_STR = str(ROOT)
+_OVERRIDES_NAME = OVERRIDES_FILE.name
 
 DEFAULT_OVERRIDES = {
     "schema": {"coords": "normalized_0_1", "fillRule": "evenodd"},
     "tiles": {},
 }
 
+EDGES = ("N", "E", "S", "W")
+EDGE_STEPS = ((0, -1), (1, 0), (0, 1), (-1, 0))
 EDGE_OPP = {"N": "S", "E": "W", "S": "N", "W": "E"}
+# (dx, dy, own edge, neighbor edge, (own half, neighbor half) pairs) for the four neighbors.
+NEIGHBOR_JOINS = (
+    (0, -1, "N", "S", (("Nw", "Sw"), ("Ne", "Se"))),
+    (1, 0, "E", "W", (("En", "Wn"), ("Es", "Ws"))),
+    (0, 1, "S", "N", (("Sw", "Nw"), ("Se", "Ne"))),
+    (-1, 0, "W", "E", (("Wn", "En"), ("Ws", "Es"))),
+)
 PORT_ROT_CW = {
     "Nw": "En",
     "Ne": "Es",
@@ -58,52 +83,91 @@ PORT_ROT_CW = {
     "Ws": "Nw",
     "Wn": "Ne",
 }
+EDGE_ROT_CW = {"N": "E", "E": "S", "S": "W", "W": "N"}
+
+
+def _build_rot_port_table():
+    # ROT_PORT[port][steps] is ``port`` rotated clockwise by ``steps`` quarter turns.
+    table = {}
+    for port in list(EDGE_ROT_CW) + list(PORT_ROT_CW):
+        seq = [port]
+        for _ in range(3):
+            prev = seq[-1]
+            seq.append(PORT_ROT_CW.get(prev) or EDGE_ROT_CW[prev])
+        table[port] = tuple(seq)
+    return table
+
+
+ROT_PORT = _build_rot_port_table()
+FEATURE_PORT_LOOKUP = {"road": "road_edge", "city": "city_edge", "field": "field_half"}
 CITY_EDGE_TO_ADJ_FIELD_PORTS = {
     "N": ["Nw", "Ne", "Wn", "En"],
     "E": ["En", "Es", "Ne", "Se"],
     "S": ["Sw", "Se", "Ws", "Es"],
     "W": ["Wn", "Ws", "Nw", "Sw"],
 }
+CITY_ADJ_SET = {edge: frozenset(ports) for edge, ports in CITY_EDGE_TO_ADJ_FIELD_PORTS.items()}
 
 BOARD_HALF_SPAN = 12
 SESSION_TIMEOUT_SEC = 60
 INVITE_TIMEOUT_SEC = 120
 MAX_CHAT_MESSAGES = 160
+CLEANUP_INTERVAL_SEC = 5.0
+WORKER_STACK_SIZE = 1024 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+STATIC_CACHE_MAX_FILE_BYTES = 1024 * 1024
 
 
 class UnionFind:
+    """Union-find over dense integer ids; items are interned on first ``add``."""
+
     def __init__(self):
-        self.parent = {}
-        self.rank = {}
+        self.index = {}
+        self.items = []
+        self.parent = []
+        # Union by rank keeps ranks below log2(n), so a byte per node is enough.
+        self.rank = array("B")
 
     def add(self, item):
-        if item not in self.parent:
-            self.parent[item] = item
-            self.rank[item] = 0
+        idx = self.index.get(item)
+        if idx is None:
+            idx = len(self.items)
+            self.index[item] = idx
+            self.items.append(item)
+            self.parent.append(idx)
+            self.rank.append(0)
+        return idx
+
+    def find_index(self, idx):
+        # Single-pass path halving: no recursion, and each step shortens the path.
+        parent = self.parent
+        up = parent[idx]
+        while up != idx:
+            up = parent[idx] = parent[up]
+            idx = up
+            up = parent[idx]
+        return idx
 
     def find(self, item):
-        parent = self.parent[item]
-        if parent == item:
-            return item
-        root = self.find(parent)
-        self.parent[item] = root
-        return root
+        return self.items[self.find_index(self.index[item])]
 
-    def union(self, a, b):
-        self.add(a)
-        self.add(b)
-        ra = self.find(a)
-        rb = self.find(b)
+    def union_index(self, a, b):
+        ra = self.find_index(a)
+        rb = self.find_index(b)
         if ra == rb:
             return
-        rka = self.rank[ra]
-        rkb = self.rank[rb]
+        rank = self.rank
+        rka = rank[ra]
+        rkb = rank[rb]
         if rka < rkb:
             ra, rb = rb, ra
             rka, rkb = rkb, rka
         self.parent[rb] = ra
         if rka == rkb:
-            self.rank[ra] = rka + 1
+            rank[ra] = rka + 1
+
+    def union(self, a, b):
+        self.union_index(self.add(a), self.add(b))
 
 
 class CarcassonneEngine:
@@ -116,6 +180,21 @@ class CarcassonneEngine:
         }
         self.start_tile_id = self._pick_start_tile_id()
         self.field_city_adjacency = self._build_field_city_adjacency()
+        self.city_field_adjacency = {}
+        for tile_id, tile_map in self.field_city_adjacency.items():
+            by_city = self.city_field_adjacency.setdefault(tile_id, {})
+            for field_id, city_ids in tile_map.items():
+                for city_id in city_ids:
+                    by_city.setdefault(city_id, set()).add(field_id)
+        self._rot_cache = {
+            (tile_id, rot): self._rotate_tile_uncached(tile_id, rot)
+            for tile_id in self.tile_by_id
+            for rot in (0, 90, 180, 270)
+        }
+        self._rot_tables = {key: self._build_rotation_tables(*key) for key in self._rot_cache}
+        self._feature_maps = {
+            key: {f.get("id"): f for f in tile.get("features") or ()} for key, tile in self._rot_cache.items()
+        }
 
     def _pick_start_tile_id(self):
         tiles = self.tileset.get("tiles") or []
@@ -131,30 +210,27 @@ class CarcassonneEngine:
         for tile_id, tile in self.tile_by_id.items():
             feats = tile.get("features") or []
             fields = [f for f in feats if f.get("type") == "field"]
-            cities = [f for f in feats if f.get("type") == "city"]
+            # Field half-ports touching each city, computed once per city.
+            city_adj = [
+                (city.get("id"), frozenset().union(*(CITY_ADJ_SET.get(e, ()) for e in city.get("ports") or [])))
+                for city in feats
+                if city.get("type") == "city"
+            ]
             tile_map = {}
             for field in fields:
                 fports = set(field.get("ports") or [])
                 if not fports:
                     continue
-                hits = set()
-                for city in cities:
-                    adjacent = False
-                    for edge in city.get("ports") or []:
-                        for candidate in CITY_EDGE_TO_ADJ_FIELD_PORTS.get(edge, []):
-                            if candidate in fports:
-                                adjacent = True
-                                break
-                        if adjacent:
-                            break
-                    if adjacent:
-                        hits.add(city.get("id"))
+                hits = {city_id for city_id, adj_ports in city_adj if adj_ports & fports}
                 if hits:
                     tile_map[field.get("id")] = hits
             out[tile_id] = tile_map
         return out
 
+    # Coordinates stay within a few dozen cells of the origin, so the wire keys
+    # built for every board cell are memoized.
     @staticmethod
+    @lru_cache(maxsize=8192)
     def key_xy(x, y):
         return f"{x},{y}"
 
@@ -166,26 +242,25 @@ class CarcassonneEngine:
     @staticmethod
     def rot_port(port, rot_deg):
         steps = ((rot_deg % 360) + 360) % 360 // 90
-        q = port
-        for _ in range(steps):
-            if q in PORT_ROT_CW:
-                q = PORT_ROT_CW[q]
-            elif q == "N":
-                q = "E"
-            elif q == "E":
-                q = "S"
-            elif q == "S":
-                q = "W"
-            elif q == "W":
-                q = "N"
-            else:
-                raise ValueError(f"Unknown port: {q}")
-        return q
+        rotations = ROT_PORT.get(port)
+        if rotations is None:
+            if steps == 0:
+                return port
+            raise ValueError(f"Unknown port: {port}")
+        return rotations[steps]
 
     def rotate_tile(self, tile_id, rot_deg):
+        # Rotated tiles are shared between callers and must be treated as read-only.
+        cached = self._rot_cache.get((tile_id, rot_deg))
+        if cached is None:
+            cached = self._rotate_tile_uncached(tile_id, rot_deg)
+            self._rot_cache[(tile_id, rot_deg)] = cached
+        return cached
+
+    def _rotate_tile_uncached(self, tile_id, rot_deg):
         base = self.tile_by_id[tile_id]
         inv = (360 - rot_deg) % 360
-        out = {"id": tile_id, "edges": {}, "features": []}
+        out = {"id": tile_id, "edges": {}}
 
         for edge in ["N", "E", "S", "W"]:
             src_edge = self.rot_port(edge, inv)
@@ -196,12 +271,48 @@ class CarcassonneEngine:
                 "halves": be.get("halves"),
             }
 
+        features = []
         for feat in base.get("features") or []:
-            rf = copy.deepcopy(feat)
-            rf["ports"] = [self.rot_port(p, rot_deg) for p in (rf.get("ports") or [])]
-            out["features"].append(rf)
+            # Only "ports" changes under rotation; nested fields such as "tags" and
+            # "meeple_placement" are read-only downstream and stay shared with the base tile.
+            rf = dict(feat)
+            rf["ports"] = tuple(self.rot_port(p, rot_deg) for p in (feat.get("ports") or []))
+            features.append(rf)
+        out["features"] = tuple(features)
         return out
 
+    def _build_rotation_tables(self, tile_id, rot_deg):
+        tile = self.rotate_tile(tile_id, rot_deg)
+        primaries = tuple(tile["edges"][edge]["primary"] for edge in EDGES)
+        lookup = {"road_edge": {}, "city_edge": {}, "field_half": {}}
+        for idx, feat in enumerate(tile["features"]):
+            slot = FEATURE_PORT_LOOKUP.get(feat.get("type"))
+            if slot is None:
+                continue
+            for p in feat.get("ports") or ():
+                lookup[slot][p] = idx
+        return primaries, lookup
+
+    def rotation_tables(self, tile_id, rot_deg):
+        """Return ``(edge_primaries, port_lookup)`` for a rotated tile.
+
+        ``edge_primaries`` is the N/E/S/W primary type tuple; ``port_lookup`` maps
+        road/city edges and field halves to indexes into the rotated feature tuple.
+        """
+        tables = self._rot_tables.get((tile_id, rot_deg))
+        if tables is None:
+            tables = self._build_rotation_tables(tile_id, rot_deg)
+            self._rot_tables[(tile_id, rot_deg)] = tables
+        return tables
+
+    def feature_by_id(self, tile_id, rot_deg):
+        """Return the read-only ``{feature_id: feature}`` map of a rotated tile."""
+        features = self._feature_maps.get((tile_id, rot_deg))
+        if features is None:
+            features = {f.get("id"): f for f in self.rotate_tile(tile_id, rot_deg).get("features") or ()}
+            self._feature_maps[(tile_id, rot_deg)] = features
+        return features
+
     def _within_bounds(self, x, y):
         return abs(x) <= BOARD_HALF_SPAN and abs(y) <= BOARD_HALF_SPAN
 
@@ -209,33 +320,24 @@ class CarcassonneEngine:
         if not self._within_bounds(x, y):
             return False, "Out of board bounds."
 
-        key = self.key_xy(x, y)
-        if key in board:
+        if (x, y) in board:
             return False, "Cell occupied."
 
         has_any = bool(board)
         touches = False
-        tile = self.rotate_tile(tile_id, rot_deg)
-
-        neighbors = [
-            (0, -1, "N"),
-            (1, 0, "E"),
-            (0, 1, "S"),
-            (-1, 0, "W"),
-        ]
+        primaries = self.rotation_tables(tile_id, rot_deg)[0]
 
-        for dx, dy, edge in neighbors:
-            nk = self.key_xy(x + dx, y + dy)
-            n_inst = board.get(nk)
+        for edge_idx, (dx, dy) in enumerate(EDGE_STEPS):
+            n_inst = board.get((x + dx, y + dy))
             if not n_inst:
                 continue
             touches = True
-            n_tile = self.rotate_tile(n_inst["tileId"], n_inst["rotDeg"])
-            opp = EDGE_OPP[edge]
-            a = tile["edges"][edge]["primary"]
-            b = n_tile["edges"][opp]["primary"]
+            n_primaries = self.rotation_tables(n_inst["tileId"], n_inst["rotDeg"])[0]
+            opp_idx = (edge_idx + 2) % 4
+            a = primaries[edge_idx]
+            b = n_primaries[opp_idx]
             if a != b:
-                return False, f"Edge mismatch {edge}: {a} vs neighbor {opp}: {b}"
+                return False, f"Edge mismatch {EDGES[edge_idx]}: {a} vs neighbor {EDGES[opp_idx]}: {b}"
 
         if has_any and not touches:
             return False, "Tile must touch at least one placed tile."
@@ -247,21 +349,43 @@ class CarcassonneEngine:
             frontier.add((0, 0))
             return frontier
 
-        for cell_key in board:
-            x, y = self.parse_xy(cell_key)
+        for x, y in board:
             for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
                 if not self._within_bounds(nx, ny):
                     continue
-                nk = self.key_xy(nx, ny)
-                if nk not in board:
+                if (nx, ny) not in board:
                     frontier.add((nx, ny))
         return frontier
 
-    def has_any_placement(self, board, tile_id):
-        for x, y in self.build_frontier(board):
-            for rot in (0, 90, 180, 270):
-                ok, _ = self.can_place_at(board, tile_id, rot, x, y)
-                if ok:
+    def extend_frontier(self, frontier, board, x, y):
+        """Update ``frontier`` in place after a tile was placed at (x, y)."""
+        frontier.discard((x, y))
+        for dx, dy in EDGE_STEPS:
+            nx, ny = x + dx, y + dy
+            if self._within_bounds(nx, ny) and (nx, ny) not in board:
+                frontier.add((nx, ny))
+
+    def _required_primaries(self, board, x, y):
+        # Per edge, the primary a tile at (x, y) must match, or None if that side is open.
+        req = []
+        for edge_idx, (dx, dy) in enumerate(EDGE_STEPS):
+            n_inst = board.get((x + dx, y + dy))
+            if not n_inst:
+                req.append(None)
+                continue
+            req.append(self.rotation_tables(n_inst["tileId"], n_inst["rotDeg"])[0][(edge_idx + 2) % 4])
+        return tuple(req)
+
+    def has_any_placement(self, board, tile_id, frontier=None):
+        # Frontier cells are in bounds, empty and touch the board, so only edges need checking.
+        if frontier is None:
+            frontier = self.build_frontier(board)
+        # Many frontier cells share the same edge requirements, so test each signature once.
+        signatures = {self._required_primaries(board, x, y) for x, y in frontier}
+        for rot in (0, 90, 180, 270):
+            primaries = self.rotation_tables(tile_id, rot)[0]
+            for req in signatures:
+                if all(r is None or r == p for r, p in zip(req, primaries)):
                     return True
         return False
 
@@ -295,7 +419,7 @@ class CarcassonneEngine:
 
     @staticmethod
     def stable_group_key(group):
-        return f"{group['type']}|{'/'.join(sorted(group['nodes']))}"
+        return f"{group['type']}|{'/'.join(group['sorted_nodes'])}"
 
     @staticmethod
     def winners_of_group(group):
@@ -311,234 +435,380 @@ class CarcassonneEngine:
             winners.append(2)
         return winners
 
-    @staticmethod
-    def _edge_delta(edge):
-        if edge == "N":
-            return 0, -1
-        if edge == "E":
-            return 1, 0
-        if edge == "S":
-            return 0, 1
-        if edge == "W":
-            return -1, 0
-        raise ValueError(f"Bad edge: {edge}")
+    def new_analysis(self):
+        """Return an empty board analysis to be extended with ``add_to_analysis``."""
+        return {
+            "uf": UnionFind(),
+            "node_meta": {},
+            "groups": {},
+            "cells": {},
+            "per_tile_lookup": {},
+            "node_ids_by_inst": {},
+        }
 
     def analyze_board(self, board):
-        uf = UnionFind()
-        node_meta = {}
-        per_tile_lookup = {}
-        inst_by_id = {}
-
+        analysis = self.new_analysis()
         for cell_key, inst in board.items():
-            inst_id = inst["instId"]
-            inst_by_id[inst_id] = {"cell_key": cell_key, "inst": inst}
-            tile = self.rotate_tile(inst["tileId"], inst["rotDeg"])
-
-            road_edge = {}
-            city_edge = {}
-            field_half = {}
-
-            for feat in tile.get("features") or []:
-                node_key = f"{inst_id}:{feat['id']}"
-                uf.add(node_key)
-                node_meta[node_key] = {
-                    "type": feat.get("type"),
-                    "ports": list(feat.get("ports") or []),
-                    "tags": feat.get("tags") or {},
-                    "meeple_placement": feat.get("meeple_placement") or [0.5, 0.5],
-                    "inst_id": inst_id,
-                    "cell_key": cell_key,
-                    "local_id": feat.get("id"),
-                }
-
-                if feat.get("type") == "road":
-                    for p in feat.get("ports") or []:
-                        road_edge[p] = feat.get("id")
-                elif feat.get("type") == "city":
-                    for p in feat.get("ports") or []:
-                        city_edge[p] = feat.get("id")
-                elif feat.get("type") == "field":
-                    for p in feat.get("ports") or []:
-                        field_half[p] = feat.get("id")
-
-            per_tile_lookup[inst_id] = {
-                "road_edge": road_edge,
-                "city_edge": city_edge,
-                "field_half": field_half,
-            }
+            self.add_to_analysis(analysis, cell_key, inst)
+        return analysis
 
-        for cell_key, inst in board.items():
-            x, y = self.parse_xy(cell_key)
-            look_a = per_tile_lookup[inst["instId"]]
-
-            for nx, ny, edge_a, edge_b, half_pairs in (
-                (x + 1, y, "E", "W", (("En", "Wn"), ("Es", "Ws"))),
-                (x, y + 1, "S", "N", (("Sw", "Nw"), ("Se", "Ne"))),
-            ):
-                nk = self.key_xy(nx, ny)
-                inst_b = board.get(nk)
-                if not inst_b:
+    @staticmethod
+    def _merge_groups(into, other):
+        into["nodes"] |= other["nodes"]
+        into["sorted_nodes"] = list(heapq.merge(into["sorted_nodes"], other["sorted_nodes"]))
+        into["tiles"] |= other["tiles"]
+        for player, cnt in other["meeples_by_player"].items():
+            into["meeples_by_player"][player] = into["meeples_by_player"].get(player, 0) + cnt
+        into["pennants"] += other["pennants"]
+        into["adj_completed_cities"] |= other["adj_completed_cities"]
+        into["open_ports"] |= other["open_ports"]
+
+    def _union_nodes(self, analysis, a, b):
+        uf = analysis["uf"]
+        groups = analysis["groups"]
+        ra = uf.find_index(a)
+        rb = uf.find_index(b)
+        if ra == rb:
+            return groups[uf.items[ra]]
+        uf.union_index(ra, rb)
+        root = uf.find_index(ra)
+        absorbed = rb if root == ra else ra
+        keep = groups.pop(uf.items[root])
+        other = groups.pop(uf.items[absorbed])
+        if len(keep["nodes"]) < len(other["nodes"]):
+            keep, other = other, keep
+        self._merge_groups(keep, other)
+        keep["id"] = uf.items[root]
+        groups[keep["id"]] = keep
+        return keep
+
+    def _mark_city_complete(self, analysis, city_group):
+        # A completed city never changes again, so its key can be pushed to adjacent fields once.
+        uf = analysis["uf"]
+        node_meta = analysis["node_meta"]
+        for node_key in city_group["nodes"]:
+            meta = node_meta[node_key]
+            tile_id = analysis["cells"][meta["cell_key"]]["tileId"]
+            for field_local in self.city_field_adjacency.get(tile_id, {}).get(meta["local_id"], ()):
+                field_node = f"{meta['inst_id']}:{field_local}"
+                if field_node not in node_meta:
                     continue
-                look_b = per_tile_lookup[inst_b["instId"]]
-
-                if edge_a in look_a["road_edge"] and edge_b in look_b["road_edge"]:
-                    uf.union(
-                        f"{inst['instId']}:{look_a['road_edge'][edge_a]}",
-                        f"{inst_b['instId']}:{look_b['road_edge'][edge_b]}",
-                    )
-                if edge_a in look_a["city_edge"] and edge_b in look_b["city_edge"]:
-                    uf.union(
-                        f"{inst['instId']}:{look_a['city_edge'][edge_a]}",
-                        f"{inst_b['instId']}:{look_b['city_edge'][edge_b]}",
-                    )
-
-                for half_a, half_b in half_pairs:
-                    if half_a in look_a["field_half"] and half_b in look_b["field_half"]:
-                        uf.union(
-                            f"{inst['instId']}:{look_a['field_half'][half_a]}",
-                            f"{inst_b['instId']}:{look_b['field_half'][half_b]}",
-                        )
-
-        groups = {}
-        for node_key, meta in node_meta.items():
-            root = uf.find(node_key)
-            if root not in groups:
-                groups[root] = {
-                    "id": root,
-                    "type": meta["type"],
-                    "nodes": set(),
-                    "tiles": set(),
-                    "meeples_by_player": {1: 0, 2: 0},
-                    "pennants": 0,
-                    "complete": False,
-                    "open_ports": set(),
-                    "adjacent_count": 0,
-                    "adj_completed_cities": set(),
-                    "key": "",
-                }
-            g = groups[root]
-            g["nodes"].add(node_key)
-            g["tiles"].add(meta["inst_id"])
-            if meta["type"] == "city":
-                g["pennants"] += int(meta["tags"].get("pennants", 0) or 0)
+                analysis["groups"][uf.find(field_node)]["adj_completed_cities"].add(city_group["key"])
 
-        for cell_key, inst in board.items():
-            for meeple in inst.get("meeples") or []:
-                node_key = f"{inst['instId']}:{meeple['featureLocalId']}"
-                if node_key not in node_meta:
-                    continue
-                root = uf.find(node_key)
-                g = groups.get(root)
-                if not g:
+    def _cloister_groups_at(self, analysis, cell_key):
+        inst = analysis["cells"].get(cell_key)
+        if not inst:
+            return []
+        uf = analysis["uf"]
+        out = []
+        for node_id in analysis["node_ids_by_inst"][inst["instId"]]:
+            node_key = uf.items[node_id]
+            if analysis["node_meta"][node_key]["type"] == "cloister":
+                out.append(analysis["groups"][uf.items[uf.find_index(node_id)]])
+        return out
+
+    def groups_around(self, analysis, cell_key):
+        """Return the groups with a node on ``cell_key`` or one of its 8 neighbours.
+
+        These are the only groups whose completion can change when a tile is
+        placed at ``cell_key`` (cloisters look at the full 3x3 ring).
+        """
+        uf = analysis["uf"]
+        cells = analysis["cells"]
+        node_ids_by_inst = analysis["node_ids_by_inst"]
+        x, y = cell_key
+        roots = set()
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                inst = cells.get((x + dx, y + dy))
+                if not inst:
                     continue
-                player = int(meeple.get("player", 0) or 0)
-                if player in (1, 2):
-                    g["meeples_by_player"][player] = g["meeples_by_player"].get(player, 0) + 1
+                for node_id in node_ids_by_inst[inst["instId"]]:
+                    roots.add(uf.items[uf.find_index(node_id)])
+        groups = analysis["groups"]
+        return [groups[root] for root in roots]
+
+    def occupancy_if_placed(self, analysis, cell_key, tile_id, rot_deg, feature_id):
+        """Return the meeple count the group of ``feature_id`` would have after placing the tile.
+
+        Mirrors the joins ``add_to_analysis`` would make without touching ``analysis``:
+        features of the new tile are linked to the neighbour roots they would merge with,
+        and the selected feature's component is followed through shared roots.
+        """
+        features = self.rotate_tile(tile_id, rot_deg).get("features") or ()
+        target = next((i for i, f in enumerate(features) if f.get("id") == feature_id), None)
+        if target is None:
+            return 0
+        look_a = self.rotation_tables(tile_id, rot_deg)[1]
+        uf = analysis["uf"]
+        cells = analysis["cells"]
+        links = [set() for _ in features]
+        x, y = cell_key
+        for dx, dy, edge_a, edge_b, half_pairs in NEIGHBOR_JOINS:
+            inst_b = cells.get((x + dx, y + dy))
+            if not inst_b:
+                continue
+            ids_b = analysis["node_ids_by_inst"][inst_b["instId"]]
+            look_b = analysis["per_tile_lookup"][inst_b["instId"]]
+            for slot in ("road_edge", "city_edge"):
+                if edge_a in look_a[slot] and edge_b in look_b[slot]:
+                    links[look_a[slot][edge_a]].add(uf.find_index(ids_b[look_b[slot][edge_b]]))
+            field_a = look_a["field_half"]
+            field_b = look_b["field_half"]
+            for half_a, half_b in half_pairs:
+                if half_a in field_a and half_b in field_b:
+                    links[field_a[half_a]].add(uf.find_index(ids_b[field_b[half_b]]))
+
+        seen = {target}
+        roots = set()
+        stack = [target]
+        while stack:
+            for root in links[stack.pop()] - roots:
+                roots.add(root)
+                for other, other_roots in enumerate(links):
+                    if other not in seen and root in other_roots:
+                        seen.add(other)
+                        stack.append(other)
+
+        groups = analysis["groups"]
+        total = 0
+        for root in roots:
+            meeples_by_player = groups[uf.items[root]]["meeples_by_player"]
+            total += meeples_by_player.get(1, 0) + meeples_by_player.get(2, 0)
+        return total
+
+    def add_to_analysis(self, analysis, cell_key, inst):
+        """Extend ``analysis`` in place with a tile placed at ``cell_key``.
+
+        Only the new tile's features, the groups they merge into and cloisters
+        around the cell are re-derived; the rest of the analysis is reused.
+        """
+        uf = analysis["uf"]
+        node_meta = analysis["node_meta"]
+        groups = analysis["groups"]
+        cells = analysis["cells"]
+        inst_id = inst["instId"]
+        cells[cell_key] = inst
+        tile = self.rotate_tile(inst["tileId"], inst["rotDeg"])
+
+        node_ids = []
+        for feat in tile.get("features") or []:
+            node_key = f"{inst_id}:{feat['id']}"
+            node_ids.append(uf.add(node_key))
+            node_meta[node_key] = {
+                "type": feat.get("type"),
+                "ports": list(feat.get("ports") or []),
+                "tags": feat.get("tags") or {},
+                "meeple_placement": feat.get("meeple_placement") or [0.5, 0.5],
+                "inst_id": inst_id,
+                "cell_key": cell_key,
+                "local_id": feat.get("id"),
+            }
+            groups[node_key] = {
+                "id": node_key,
+                "type": feat.get("type"),
+                "nodes": {node_key},
+                "sorted_nodes": [node_key],
+                "tiles": {inst_id},
+                "meeples_by_player": {1: 0, 2: 0},
+                "pennants": int((feat.get("tags") or {}).get("pennants", 0) or 0) if feat.get("type") == "city" else 0,
+                "complete": False,
+                # Every road/city port starts open and is closed when joined to a matching neighbor.
+                "open_ports": {(cell_key, p) for p in feat.get("ports") or ()}
+                if feat.get("type") in ("road", "city")
+                else set(),
+                "adjacent_count": 0,
+                "adj_completed_cities": set(),
+                "key": "",
+            }
+        analysis["node_ids_by_inst"][inst_id] = node_ids
+        look_a = self.rotation_tables(inst["tileId"], inst["rotDeg"])[1]
+        analysis["per_tile_lookup"][inst_id] = look_a
 
-        for g in groups.values():
-            g["key"] = self.stable_group_key(g)
+        for meeple in inst.get("meeples") or []:
+            self.adjust_meeples(analysis, f"{inst_id}:{meeple['featureLocalId']}", meeple.get("player"), 1)
 
-        for g in groups.values():
-            if g["type"] in ("road", "city"):
-                open_ports = set()
-                for node_key in g["nodes"]:
-                    meta = node_meta[node_key]
-                    x, y = self.parse_xy(meta["cell_key"])
-                    for edge in meta["ports"]:
-                        dx, dy = self._edge_delta(edge)
-                        nk = self.key_xy(x + dx, y + dy)
-                        n_inst = board.get(nk)
-                        if not n_inst:
-                            open_ports.add(f"{meta['cell_key']}:{edge}")
-                            continue
-                        n_lookup = per_tile_lookup[n_inst["instId"]]
-                        opp = EDGE_OPP[edge]
-                        if g["type"] == "road":
-                            if opp not in n_lookup["road_edge"]:
-                                open_ports.add(f"{meta['cell_key']}:{edge}")
-                        else:
-                            if opp not in n_lookup["city_edge"]:
-                                open_ports.add(f"{meta['cell_key']}:{edge}")
-                g["open_ports"] = open_ports
-                g["complete"] = len(open_ports) == 0
-            elif g["type"] == "cloister":
-                only_inst_id = next(iter(g["tiles"]), None)
-                cell_key = (inst_by_id.get(only_inst_id) or {}).get("cell_key")
-                if cell_key is None:
-                    g["adjacent_count"] = 0
-                    g["complete"] = False
-                else:
-                    x, y = self.parse_xy(cell_key)
-                    cnt = 0
-                    for dy in (-1, 0, 1):
-                        for dx in (-1, 0, 1):
-                            if dx == 0 and dy == 0:
-                                continue
-                            if self.key_xy(x + dx, y + dy) in board:
-                                cnt += 1
-                    g["adjacent_count"] = cnt
-                    g["complete"] = cnt == 8
-
-        for g in groups.values():
-            if g["type"] != "field":
+        x, y = cell_key
+        for dx, dy, edge_a, edge_b, half_pairs in NEIGHBOR_JOINS:
+            inst_b = cells.get((x + dx, y + dy))
+            if not inst_b:
                 continue
-            for node_key in g["nodes"]:
-                meta = node_meta[node_key]
-                inst = board.get(meta["cell_key"])
-                if not inst:
+            ids_b = analysis["node_ids_by_inst"][inst_b["instId"]]
+            look_b = analysis["per_tile_lookup"][inst_b["instId"]]
+
+            for slot in ("road_edge", "city_edge"):
+                if edge_a in look_a[slot] and edge_b in look_b[slot]:
+                    g = self._union_nodes(analysis, node_ids[look_a[slot][edge_a]], ids_b[look_b[slot][edge_b]])
+                    g["open_ports"].discard((cell_key, edge_a))
+                    g["open_ports"].discard(((x + dx, y + dy), edge_b))
+
+            field_a = look_a["field_half"]
+            field_b = look_b["field_half"]
+            for half_a, half_b in half_pairs:
+                if half_a in field_a and half_b in field_b:
+                    self._union_nodes(analysis, node_ids[field_a[half_a]], ids_b[field_b[half_b]])
+
+        affected = {uf.items[uf.find_index(node_id)] for node_id in node_ids}
+        for root in affected:
+            g = groups[root]
+            g["key"] = self.stable_group_key(g)
+            if g["type"] in ("road", "city"):
+                g["complete"] = len(g["open_ports"]) == 0
+        for root in affected:
+            g = groups[root]
+            if g["type"] == "city" and g["complete"]:
+                self._mark_city_complete(analysis, g)
+
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if dx == 0 and dy == 0:
                     continue
-                tile_adj = self.field_city_adjacency.get(inst["tileId"], {})
-                city_locals = tile_adj.get(meta["local_id"], set())
-                for city_local in city_locals:
-                    city_node = f"{meta['inst_id']}:{city_local}"
-                    if city_node not in node_meta:
-                        continue
-                    city_root = uf.find(city_node)
-                    city_group = groups.get(city_root)
-                    if city_group and city_group["type"] == "city" and city_group["complete"]:
-                        g["adj_completed_cities"].add(city_group["key"])
+                for g in self._cloister_groups_at(analysis, (x + dx, y + dy)):
+                    g["adjacent_count"] += 1
+                    g["complete"] = g["adjacent_count"] == 8
+        for g in self._cloister_groups_at(analysis, cell_key):
+            cnt = 0
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    if (dx or dy) and (x + dx, y + dy) in cells:
+                        cnt += 1
+            g["adjacent_count"] = cnt
+            g["complete"] = cnt == 8
 
-        return {"uf": uf, "node_meta": node_meta, "groups": groups}
+    @staticmethod
+    def adjust_meeples(analysis, node_key, player, delta):
+        """Add ``delta`` meeples of ``player`` to the group containing ``node_key``."""
+        player = int(player or 0)
+        if node_key not in analysis["node_meta"] or player not in (1, 2):
+            return
+        g = analysis["groups"].get(analysis["uf"].find(node_key))
+        if g:
+            g["meeples_by_player"][player] = g["meeples_by_player"].get(player, 0) + delta
 
 
 def normalize_overrides_payload(raw):
-    out = raw if isinstance(raw, dict) else dict(DEFAULT_OVERRIDES)
+    # Payloads come from JSON decoding, so exact ``type(...) is dict`` checks suffice.
+    out = raw if type(raw) is dict else dict(DEFAULT_OVERRIDES)
     schema = out.get("schema")
-    if not isinstance(schema, dict):
+    if type(schema) is not dict:
         schema = {}
-    schema.setdefault("coords", "normalized_0_1")
-    schema.setdefault("fillRule", "evenodd")
-    out["schema"] = schema
+    out["schema"] = {"coords": "normalized_0_1", "fillRule": "evenodd", **schema}
 
     tiles = out.get("tiles")
-    if not isinstance(tiles, dict):
+    if type(tiles) is not dict:
         tiles = {}
-    for tile_id, tile_entry in list(tiles.items()):
-        if not isinstance(tile_entry, dict):
-            tiles[tile_id] = {"features": {}}
-            continue
-        feats = tile_entry.get("features")
-        if not isinstance(feats, dict):
-            tile_entry["features"] = {}
-    out["tiles"] = tiles
+    out["tiles"] = {
+        tile_id: (
+            (tile_entry if type(tile_entry.get("features")) is dict else {**tile_entry, "features": {}})
+            if type(tile_entry) is dict
+            else {"features": {}}
+        )
+        for tile_id, tile_entry in tiles.items()
+    }
     return out
 
 
-def load_overrides_file():
-    if not OVERRIDES_FILE.exists():
-        return dict(DEFAULT_OVERRIDES)
-    with OVERRIDES_FILE.open("r", encoding="utf-8") as f:
-        payload = json.load(f)
-    return normalize_overrides_payload(payload)
+# (st_mtime_ns, st_size, response_body, response_body_gz) of the last parsed overrides file.
+_overrides_cache = None
+
+
+def decode_json(data):
+    """Parse UTF-8 JSON ``data`` (bytes); raises ``json.JSONDecodeError`` on bad input."""
+    if orjson is not None:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError.
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _load_overrides_entry():
+    """Return the ``_overrides_cache`` entry for the file on disk, or None if it is missing."""
+    global _overrides_cache
+    try:
+        st = OVERRIDES_FILE.stat()
+    except FileNotFoundError:
+        return None
+    cached = _overrides_cache
+    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached
+    try:
+        # The file can be replaced or removed between the stat and the read.
+        data = OVERRIDES_FILE.read_bytes()
+    except FileNotFoundError:
+        return None
+    payload = normalize_overrides_payload(decode_json(data))
+    body = encode_json_compact(payload)
+    cached = (st.st_mtime_ns, st.st_size, body, gzip_body(body))
+    _overrides_cache = cached
+    return cached
+
+
+def load_overrides_body(accept_gzip=False):
+    """Return ``(body, content_encoding)`` for ``GET /api/overrides``.
+
+    The body (and its gzip form) is encoded once per file version and cached.
+    """
+    entry = _load_overrides_entry()
+    if entry is None:
+        return (DEFAULT_OVERRIDES_BODY_GZ, "gzip") if accept_gzip else (DEFAULT_OVERRIDES_BODY, None)
+    return (entry[3], "gzip") if accept_gzip else (entry[2], None)
+
+
+def dump_overrides_bytes(payload):
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(payload, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def encode_json_compact(payload):
+    """Encode ``payload`` as compact UTF-8 JSON for API responses."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            # orjson.JSONEncodeError subclasses TypeError; it refuses e.g. ints
+            # beyond 64 bits, which the stdlib encoder handles.
+            pass
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+def gzip_body(body):
+    # Level 1 gets most of the size win on JSON for a fraction of the CPU cost.
+    return gzip.compress(body, compresslevel=1, mtime=0)
+
+
+# Served as-is while no overrides file exists.
+DEFAULT_OVERRIDES_BODY = encode_json_compact(normalize_overrides_payload(dict(DEFAULT_OVERRIDES)))
+DEFAULT_OVERRIDES_BODY_GZ = gzip_body(DEFAULT_OVERRIDES_BODY)
+# Reply to every successful POST /api/overrides.
+OVERRIDES_SAVED_BODY = encode_json_compact({"ok": True, "file": _OVERRIDES_NAME})
+
+
+# Set by --unsafe-fast-writes: overwrite the file in place instead of temp file + rename.
+FAST_OVERRIDES_WRITES = False
 
 
 def write_overrides_file(payload):
+    global _overrides_cache
     payload = normalize_overrides_payload(payload)
-    with NamedTemporaryFile("w", delete=False, dir=ROOT, encoding="utf-8") as tmp:
-        json.dump(payload, tmp, indent=2)
-        tmp.write("\n")
-        tmp_path = Path(tmp.name)
-    tmp_path.replace(OVERRIDES_FILE)
+    body = dump_overrides_bytes(payload)
+    if FAST_OVERRIDES_WRITES:
+        with OVERRIDES_FILE.open("wb") as f:
+            f.write(body)
+    else:
+        with NamedTemporaryFile("wb", delete=False, dir=ROOT) as tmp:
+            tmp.write(body)
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(OVERRIDES_FILE)
+    _overrides_cache = None
+
+
+def sync_overrides_file():
+    """Flush the overrides file to disk; used on shutdown after in-place writes."""
+    try:
+        with OVERRIDES_FILE.open("rb") as f:
+            os.fsync(f.fileno())
+    except FileNotFoundError:
+        pass
 
 
 def sanitize_name(raw):
@@ -558,7 +828,11 @@ class MultiplayerState:
             tileset_payload = json.load(f)
 
         self.engine = CarcassonneEngine(tileset_payload)
-        self.lock = threading.Lock()
+        # Lock order is always lobby_lock -> match lock. The lobby lock guards users,
+        # invites, chat and the matches index; each match lock guards that match's
+        # state. Match polls and intents only hold the lobby lock for the lookup.
+        self.lobby_lock = threading.Lock()
+        self.match_locks = {}
 
         self.users_by_id = {}
         self.user_by_token = {}
@@ -566,6 +840,23 @@ class MultiplayerState:
         self.matches = {}
         self.chat = []
 
+        # Lobby indexes, kept in sync with the collections above.
+        self.names_casefold = set()
+        # Every touch moves a user to the end, so the front is always the least recently seen.
+        self.users_by_last_seen = OrderedDict()
+        # user id -> {invite id: invite} for pending invites sent or received, in creation order.
+        self.pending_invites_by_user = {}
+        # frozenset({from_user_id, to_user_id}) -> pending invite between the pair.
+        self.pending_invite_by_pair = {}
+
+        # Bumped on every change visible in a lobby payload; keys the cached
+        # users/chat lists and the lobby ETag.
+        self.lobby_version = 0
+        self._etag_salt = secrets.token_hex(4)
+        self._users_cache = (-1, None)
+        self._chat_cache = (-1, None)
+        self._last_cleanup = 0.0
+
         self.next_user_id = 1
         self.next_invite_id = 1
         self.next_match_id = 1
@@ -591,7 +882,11 @@ class MultiplayerState:
         self.next_chat_id += 1
         return cid
 
+    def _bump_lobby_locked(self):
+        self.lobby_version += 1
+
     def _push_chat_locked(self, text, from_user=None, system=False):
+        self._bump_lobby_locked()
         now = int(time.time())
         msg = {
             "id": self._new_chat_id(),
@@ -627,10 +922,11 @@ class MultiplayerState:
             self.user_by_token.pop(token, None)
             return None
         user["last_seen"] = time.time()
+        self.users_by_last_seen.move_to_end(uid)
         return user
 
     def _unique_name_locked(self, wanted):
-        existing = {u["name"].casefold() for u in self.users_by_id.values()}
+        existing = self.names_casefold
         if wanted.casefold() not in existing:
             return wanted
         idx = 2
@@ -640,42 +936,74 @@ class MultiplayerState:
                 return cand
             idx += 1
 
+    def _add_pending_invite_locked(self, invite):
+        self._bump_lobby_locked()
+        for uid in (invite["from_user_id"], invite["to_user_id"]):
+            self.pending_invites_by_user.setdefault(uid, {})[invite["id"]] = invite
+        self.pending_invite_by_pair[frozenset((invite["from_user_id"], invite["to_user_id"]))] = invite
+
+    def _set_invite_status_locked(self, invite, status):
+        self._bump_lobby_locked()
+        invite["status"] = status
+        pair = frozenset((invite["from_user_id"], invite["to_user_id"]))
+        if self.pending_invite_by_pair.get(pair) is invite:
+            del self.pending_invite_by_pair[pair]
+        for uid in (invite["from_user_id"], invite["to_user_id"]):
+            pending = self.pending_invites_by_user.get(uid)
+            if pending is None:
+                continue
+            pending.pop(invite["id"], None)
+            if not pending:
+                del self.pending_invites_by_user[uid]
+
+    def _pending_invites_of_locked(self, user_id):
+        return list((self.pending_invites_by_user.get(user_id) or {}).values())
+
     def _cleanup_locked(self):
+        # Timeouts are tens of seconds, so sweeping on every request is wasted work.
         now = time.time()
-
-        stale_user_ids = [
-            uid
-            for uid, user in self.users_by_id.items()
-            if (now - user.get("last_seen", now)) > SESSION_TIMEOUT_SEC
-        ]
+        if now - self._last_cleanup < CLEANUP_INTERVAL_SEC:
+            return
+        self._last_cleanup = now
+
+        stale_user_ids = []
+        for uid in self.users_by_last_seen:
+            if (now - self.users_by_id[uid]["last_seen"]) <= SESSION_TIMEOUT_SEC:
+                break
+            stale_user_ids.append(uid)
+        stale_user_ids.sort(key=lambda uid: self.users_by_id[uid]["joined_at"])
         for uid in stale_user_ids:
             self._remove_user_locked(uid, reason="timeout")
 
-        for invite in self.invites.values():
-            if invite.get("status") != "pending":
-                continue
-            if (now - invite.get("created_at", now)) > INVITE_TIMEOUT_SEC:
-                invite["status"] = "expired"
+        expired = []
+        for pending in self.pending_invites_by_user.values():
+            for invite in pending.values():
+                if (now - invite.get("created_at", now)) > INVITE_TIMEOUT_SEC:
+                    expired.append(invite)
+        for invite in expired:
+            if invite["status"] == "pending":
+                self._set_invite_status_locked(invite, "expired")
                 invite["responded_at"] = now
 
     def _remove_user_locked(self, user_id, reason="left"):
         user = self.users_by_id.pop(user_id, None)
         if not user:
             return
+        self._bump_lobby_locked()
+        self.users_by_last_seen.pop(user_id, None)
+        self.names_casefold.discard(user["name"].casefold())
         token = user.get("token")
         if token:
             self.user_by_token.pop(token, None)
 
-        for invite in self.invites.values():
-            if invite.get("status") != "pending":
-                continue
-            if user_id in (invite.get("from_user_id"), invite.get("to_user_id")):
-                invite["status"] = "expired"
-                invite["responded_at"] = time.time()
+        for invite in self._pending_invites_of_locked(user_id):
+            self._set_invite_status_locked(invite, "expired")
+            invite["responded_at"] = time.time()
 
         mid = user.get("match_id")
-        if mid:
-            self._abort_match_locked(mid, f"{user['name']} disconnected.")
+        if mid in self.matches:
+            with self.match_locks[mid]:
+                self._abort_match_locked(mid, f"{user['name']} disconnected.")
 
         if reason == "timeout":
             self._push_chat_locked(f"{user['name']} disconnected.", system=True)
@@ -686,22 +1014,27 @@ class MultiplayerState:
         match = self.matches.get(match_id)
         if not match:
             return
+        self._bump_lobby_locked()
         if match.get("status") == "active":
+            self._touch_match_locked(match)
             match["status"] = "aborted"
             match["finished_at"] = time.time()
             match["current_tile"] = None
             match["burned_turn"] = []
             match["turn_intent"] = None
-            match["next_tiles"] = {1: None, 2: None}
+            match["next_tiles"] = [None, None, None]
             match["last_event"] = reason
 
-        for uid in match["players"].values():
+        for uid in match["players"][1:]:
             user = self.users_by_id.get(uid)
             if user and user.get("match_id") == match_id:
                 user["match_id"] = None
                 user["last_match_id"] = match_id
 
     def _serialize_users_locked(self):
+        version, users = self._users_cache
+        if version == self.lobby_version:
+            return users
         users = []
         for user in sorted(self.users_by_id.values(), key=lambda u: u["name"].casefold()):
             users.append(
@@ -711,6 +1044,7 @@ class MultiplayerState:
                     "status": self._user_match_status_locked(user),
                 }
             )
+        self._users_cache = (self.lobby_version, users)
         return users
 
     def _serialize_invite_locked(self, invite):
@@ -726,14 +1060,23 @@ class MultiplayerState:
             "to_name": to_user["name"] if to_user else invite.get("to_name") or "Unknown",
         }
 
+    def _chat_tail_locked(self):
+        version, tail = self._chat_cache
+        if version != self.lobby_version:
+            tail = self.chat[-90:]
+            self._chat_cache = (self.lobby_version, tail)
+        return tail
+
+    def lobby_etag_locked(self, user):
+        # Every lobby payload field is derived from state that bumps lobby_version.
+        return f'W/"{self._etag_salt}-{self.lobby_version}-{user["id"]}"'
+
     def _serialize_lobby_locked(self, user):
         uid = user["id"]
         invites_for_me = []
         invites_sent_by_me = []
 
-        for invite in self.invites.values():
-            if invite.get("status") != "pending":
-                continue
+        for invite in self._pending_invites_of_locked(uid):
             if invite.get("to_user_id") == uid:
                 invites_for_me.append(self._serialize_invite_locked(invite))
             elif invite.get("from_user_id") == uid:
@@ -752,45 +1095,31 @@ class MultiplayerState:
             "users": self._serialize_users_locked(),
             "invites_for_me": invites_for_me,
             "invites_sent_by_me": invites_sent_by_me,
-            "chat": self.chat[-90:],
+            "chat": self._chat_tail_locked(),
             "current_match_id": user.get("match_id"),
             "last_match_id": user.get("last_match_id"),
         }
 
-    def _pick_random_tile_locked(self, remaining):
-        total = 0
-        for cnt in remaining.values():
-            total += max(0, int(cnt))
-        if total <= 0:
-            return None
-
-        r = random.randint(1, total)
-        acc = 0
-        for tile_id in sorted(remaining.keys()):
-            cnt = max(0, int(remaining.get(tile_id, 0)))
-            if cnt <= 0:
-                continue
-            acc += cnt
-            if r <= acc:
-                return tile_id
-        return None
-
     def _draw_reserved_tile_locked(self, match):
-        tile_id = self._pick_random_tile_locked(match["remaining"])
-        if not tile_id:
+        # "bag" holds one entry per undrawn tile; swap-pop keeps each draw O(1).
+        bag = match["bag"]
+        if not bag:
             return None
+        idx = random.randrange(len(bag))
+        bag[idx], bag[-1] = bag[-1], bag[idx]
+        tile_id = bag.pop()
         match["remaining"][tile_id] = max(0, int(match["remaining"].get(tile_id, 0)) - 1)
         return tile_id
 
     def _ensure_next_tiles_locked(self, match):
         if match.get("status") != "active":
             return
-        next_tiles = match.setdefault("next_tiles", {1: None, 2: None})
+        next_tiles = match["next_tiles"]
         turn_player = int(match.get("turn_player") or 1)
         for player in (1, 2):
             if player == turn_player:
                 continue
-            if next_tiles.get(player):
+            if next_tiles[player]:
                 continue
             tile_id = self._draw_reserved_tile_locked(match)
             if not tile_id:
@@ -798,11 +1127,12 @@ class MultiplayerState:
             next_tiles[player] = tile_id
 
     def _draw_placeable_tile_for_match_locked(self, match):
+        self._touch_match_locked(match)
         burned = []
         turn_player = int(match.get("turn_player") or 1)
-        next_tiles = match.setdefault("next_tiles", {1: None, 2: None})
+        next_tiles = match["next_tiles"]
         while True:
-            tile_id = next_tiles.get(turn_player)
+            tile_id = next_tiles[turn_player]
             if tile_id:
                 next_tiles[turn_player] = None
             else:
@@ -813,7 +1143,7 @@ class MultiplayerState:
                 self._finalize_match_locked(match)
                 return
 
-            if self.engine.has_any_placement(match["board"], tile_id):
+            if self.engine.has_any_placement(match["board"], tile_id, match["frontier"]):
                 match["current_tile"] = tile_id
                 match["burned_turn"] = burned
                 match["turn_intent"] = None
@@ -824,15 +1154,17 @@ class MultiplayerState:
 
     def _new_match_locked(self, user_a_id, user_b_id):
         match_id = self._new_match_id()
-        players = {1: user_a_id, 2: user_b_id}
+        # Per-player slots are lists indexed by player number; slot 0 is unused.
+        players = [None, user_a_id, user_b_id]
+        self._bump_lobby_locked()
 
-        remaining = copy.deepcopy(self.engine.counts)
+        remaining = dict(self.engine.counts)
         start_tile_id = self.engine.start_tile_id
         if not start_tile_id:
             raise RuntimeError("Tileset has no start tile.")
 
         board = {
-            "0,0": {
+            (0, 0): {
                 "instId": 1,
                 "tileId": start_tile_id,
                 "rotDeg": 0,
@@ -849,116 +1181,160 @@ class MultiplayerState:
             "players": players,
             "user_to_player": {user_a_id: 1, user_b_id: 2},
             "board": board,
+            "board_version": 1,
+            "frontier": self.engine.build_frontier(board),
             "inst_seq": 2,
             "remaining": remaining,
-            "score": {1: 0, 2: 0},
+            "bag": [tile_id for tile_id, cnt in remaining.items() for _ in range(max(0, int(cnt)))],
+            "score": [0, 0, 0],
             "scored_keys": set(),
-            "meeples_available": {1: 7, 2: 7},
+            # Same keys as scored_keys, kept in order for the wire payload.
+            "scored_keys_sorted": [],
+            "meeples_available": [0, 7, 7],
             "turn_player": random.choice([1, 2]),
             "turn_index": 1,
             "current_tile": None,
             "burned_turn": [],
-            "next_tiles": {1: None, 2: None},
+            "next_tiles": [None, None, None],
             "turn_intent": None,
             "last_event": "Match started.",
+            # Bumped on every change visible in the serialized match; keys wire_cache.
+            "version": 0,
+            "wire_cache": {},
         }
 
+        match_lock = threading.Lock()
+        self.match_locks[match_id] = match_lock
         self.matches[match_id] = match
-        for uid in players.values():
+        for uid in players[1:]:
             user = self.users_by_id.get(uid)
             if user:
                 user["match_id"] = match_id
 
-        self._ensure_next_tiles_locked(match)
-        self._draw_placeable_tile_for_match_locked(match)
+        with match_lock:
+            self._ensure_next_tiles_locked(match)
+            self._draw_placeable_tile_for_match_locked(match)
         return match
 
-    def _recompute_and_score_locked(self, match, reaward_all=False):
-        analysis = self.engine.analyze_board(match["board"])
-
+    def _analysis_locked(self, match):
+        # The analysis is extended tile by tile in match_submit_turn and stamped with
+        # the board_version it describes; any other board change makes it stale.
+        analysis = match.get("analysis")
+        if analysis is None or match.get("analysis_version") != match["board_version"]:
+            analysis = self.engine.analyze_board(match["board"])
+            match["analysis"] = analysis
+            match["analysis_version"] = match["board_version"]
+        return analysis
+
+    def _recompute_and_score_locked(self, match, reaward_all=False, analysis=None, placed_cell=None):
         if reaward_all:
+            match["analysis"] = None
             match["scored_keys"] = set()
-            match["score"] = {1: 0, 2: 0}
-
-        scored_now = set()
-        for g in analysis["groups"].values():
+            match["scored_keys_sorted"] = []
+            match["score"] = [0, 0, 0]
+            analysis = None
+            placed_cell = None
+        if analysis is None:
+            analysis = self._analysis_locked(match)
+
+        # Every complete group is scored on the turn it completes, so after a single
+        # placement only groups touching that cell's 3x3 neighbourhood need checking.
+        if placed_cell is None:
+            candidates = analysis["groups"].values()
+        else:
+            candidates = self.engine.groups_around(analysis, placed_cell)
+
+        scored_keys = match["scored_keys"]
+        scored_keys_sorted = match["scored_keys_sorted"]
+        score = match["score"]
+        score_feature = self.engine._score_feature
+        scored_now = []
+        for g in candidates:
             if g["type"] == "field" or not g["complete"]:
                 continue
-            if g["key"] in match["scored_keys"]:
+            key = g["key"]
+            if key in scored_keys:
                 continue
 
-            m1 = g["meeples_by_player"].get(1, 0)
-            m2 = g["meeples_by_player"].get(2, 0)
+            meeples_by_player = g["meeples_by_player"]
+            m1 = meeples_by_player.get(1, 0)
+            m2 = meeples_by_player.get(2, 0)
             mx = max(m1, m2)
             if mx <= 0:
-                match["scored_keys"].add(g["key"])
+                scored_keys.add(key)
+                insort(scored_keys_sorted, key)
                 continue
 
-            winners = []
+            pts = score_feature(g, True)
             if m1 == mx:
-                winners.append(1)
+                score[1] += pts
             if m2 == mx:
-                winners.append(2)
+                score[2] += pts
 
-            pts = self.engine._score_feature(g, True)
-            for winner in winners:
-                match["score"][winner] += pts
-
-            match["scored_keys"].add(g["key"])
-            scored_now.add(g["key"])
+            scored_keys.add(key)
+            insort(scored_keys_sorted, key)
+            scored_now.append(g)
 
         if scored_now:
-            for inst in match["board"].values():
-                kept = []
-                for meeple in inst.get("meeples") or []:
-                    node_key = f"{inst['instId']}:{meeple['featureLocalId']}"
-                    if node_key not in analysis["node_meta"]:
-                        kept.append(meeple)
-                        continue
-                    gid = analysis["uf"].find(node_key)
-                    group = analysis["groups"].get(gid)
-                    if not group:
-                        kept.append(meeple)
-                        continue
-                    if group["type"] == "field" or group["key"] not in scored_now:
-                        kept.append(meeple)
-                        continue
+            # Meeples return to their owners only from nodes of groups scored just now,
+            # and only the cells holding those nodes need to be visited.
+            scored_nodes = set()
+            for g in scored_now:
+                scored_nodes |= g["nodes"]
+            node_meta = analysis["node_meta"]
+            board = match["board"]
+            meeples_available = match["meeples_available"]
+            adjust_meeples = self.engine.adjust_meeples
+            for cell_key in {node_meta[node_key]["cell_key"] for node_key in scored_nodes}:
+                inst = board[cell_key]
+                meeples = inst.get("meeples")
+                if not meeples:
+                    continue
+                inst_id = inst["instId"]
+                freed = [m for m in meeples if f"{inst_id}:{m['featureLocalId']}" in scored_nodes]
+                if not freed:
+                    continue
+                inst["meeples"] = [m for m in meeples if f"{inst_id}:{m['featureLocalId']}" not in scored_nodes]
+                for meeple in freed:
                     player = int(meeple.get("player", 0) or 0)
-                    if player in (1, 2):
-                        match["meeples_available"][player] = min(
-                            7, match["meeples_available"].get(player, 0) + 1
-                        )
-                inst["meeples"] = kept
+                    adjust_meeples(analysis, f"{inst_id}:{meeple['featureLocalId']}", player, -1)
+                    if player in (1, 2) and meeples_available[player] < 7:
+                        meeples_available[player] += 1
 
     def _finalize_match_locked(self, match):
         if match.get("status") != "active":
             return
-
-        analysis = self.engine.analyze_board(match["board"])
+        self._bump_lobby_locked()
+        self._touch_match_locked(match)
+
+        analysis = self._analysis_locked(match)
+        scored_keys = match["scored_keys"]
+        score = match["score"]
+        winners_of_group = self.engine.winners_of_group
+        score_end_now_value = self.engine.score_end_now_value
         for g in analysis["groups"].values():
-            winners = self.engine.winners_of_group(g)
+            winners = winners_of_group(g)
             if not winners:
                 continue
 
-            if g["type"] != "field" and g["complete"] and g["key"] in match["scored_keys"]:
+            if g["type"] != "field" and g["complete"] and g["key"] in scored_keys:
                 continue
 
-            pts = self.engine.score_end_now_value(g)
+            pts = score_end_now_value(g)
             if pts <= 0:
                 continue
             for winner in winners:
-                match["score"][winner] += pts
+                score[winner] += pts
 
         match["status"] = "finished"
         match["finished_at"] = time.time()
         match["current_tile"] = None
         match["burned_turn"] = []
         match["turn_intent"] = None
-        match["next_tiles"] = {1: None, 2: None}
+        match["next_tiles"] = [None, None, None]
         match["last_event"] = "Match finished."
 
-        p1 = match["score"].get(1, 0)
-        p2 = match["score"].get(2, 0)
+        _, p1, p2 = match["score"]
         u1 = self.users_by_id.get(match["players"][1])
         u2 = self.users_by_id.get(match["players"][2])
         n1 = u1["name"] if u1 else "P1"
@@ -972,35 +1348,54 @@ class MultiplayerState:
             summary = f"Match finished: draw {p1}-{p2}."
         self._push_chat_locked(summary, system=True)
 
-        for uid in match["players"].values():
+        for uid in match["players"][1:]:
             user = self.users_by_id.get(uid)
             if user and user.get("match_id") == match["id"]:
                 user["match_id"] = None
                 user["last_match_id"] = match["id"]
 
+    def _encode_board_for_wire(self, board):
+        # Boards are keyed by (x, y) internally; clients expect "x,y" keys in row order.
+        # Decorate as (y, x) so the plain tuple sort gives row order without a key function.
+        rows = sorted([(y, x) for x, y in board])
+        key_xy = self.engine.key_xy
+        return [(key_xy(x, y), board[(x, y)]) for y, x in rows]
+
+    @staticmethod
+    def _touch_match_locked(match):
+        match["version"] += 1
+
     def _serialize_match_locked(self, match, for_user):
+        players_by_slot = match["players"]
+        score = match["score"]
+        meeples_available = match["meeples_available"]
         players = []
         for p in (1, 2):
-            uid = match["players"][p]
+            uid = players_by_slot[p]
             user = self.users_by_id.get(uid)
             players.append(
                 {
                     "player": p,
                     "user_id": uid,
                     "name": user["name"] if user else f"Player {p}",
-                    "score": int(match["score"].get(p, 0)),
-                    "meeples_left": int(match["meeples_available"].get(p, 0)),
+                    "score": int(score[p]),
+                    "meeples_left": int(meeples_available[p]),
                 }
             )
 
-        board_pairs = list(match["board"].items())
-        board_pairs.sort(key=lambda kv: (self.engine.parse_xy(kv[0])[1], self.engine.parse_xy(kv[0])[0]))
+        # Pairs reference the live inst dicts, so meeple changes show through; only
+        # adding or removing cells (a board_version bump) needs a re-sort.
+        cached = match.get("board_pairs")
+        if cached is None or cached[0] != match["board_version"]:
+            cached = (match["board_version"], self._encode_board_for_wire(match["board"]))
+            match["board_pairs"] = cached
+        board_pairs = cached[1]
 
         remaining = {k: int(v) for k, v in match["remaining"].items()}
         remaining_total = sum(max(0, int(v)) for v in remaining.values())
 
         turn_player = match.get("turn_player")
-        turn_uid = match["players"].get(turn_player) if turn_player else None
+        turn_uid = players_by_slot[turn_player] if turn_player in (1, 2) else None
         turn_user = self.users_by_id.get(turn_uid) if turn_uid else None
 
         current_turn = None
@@ -1015,22 +1410,7 @@ class MultiplayerState:
             }
 
         your_player = match["user_to_player"].get(for_user["id"])
-        next_tiles = match.get("next_tiles") or {}
-        your_next_tile = next_tiles.get(your_player) if your_player in (1, 2) else None
-        raw_intent = match.get("turn_intent")
-        turn_intent = None
-        if isinstance(raw_intent, dict):
-            turn_intent = {
-                "player": int(raw_intent.get("player") or 0),
-                "user_id": raw_intent.get("user_id"),
-                "tile_id": raw_intent.get("tile_id"),
-                "x": int(raw_intent.get("x") or 0),
-                "y": int(raw_intent.get("y") or 0),
-                "rot_deg": int(raw_intent.get("rot_deg") or 0),
-                "meeple_feature_id": raw_intent.get("meeple_feature_id"),
-                "locked": bool(raw_intent.get("locked")),
-                "valid": bool(raw_intent.get("valid", True)),
-            }
+        your_next_tile = match["next_tiles"][your_player] if your_player in (1, 2) else None
 
         payload = {
             "ok": True,
@@ -1047,21 +1427,30 @@ class MultiplayerState:
                 "inst_seq": int(match["inst_seq"]),
                 "remaining": remaining,
                 "remaining_total": remaining_total,
-                "score": {"1": int(match["score"].get(1, 0)), "2": int(match["score"].get(2, 0))},
-                "meeples_available": {
-                    "1": int(match["meeples_available"].get(1, 0)),
-                    "2": int(match["meeples_available"].get(2, 0)),
-                },
+                "score": {"1": int(score[1]), "2": int(score[2])},
+                "meeples_available": {"1": int(meeples_available[1]), "2": int(meeples_available[2])},
                 "current_turn": current_turn,
-                "turn_intent": turn_intent,
-                "scored_keys": sorted(list(match["scored_keys"])),
+                # Stored already normalized by match_intent and replaced, never mutated.
+                "turn_intent": match.get("turn_intent"),
+                "scored_keys": list(match["scored_keys_sorted"]),
                 "last_event": match.get("last_event") or "",
             },
         }
         return payload
 
+    def _serialize_match_bytes_locked(self, match, for_user):
+        # Polls between turns see the same match, so the encoded body is reused per
+        # user until the match version moves or a player's session disappears.
+        key = (match["version"], tuple(uid in self.users_by_id for uid in match["players"][1:]))
+        cached = match["wire_cache"].get(for_user["id"])
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        body = encode_json_compact(self._serialize_match_locked(match, for_user))
+        match["wire_cache"][for_user["id"]] = (key, body)
+        return body
+
     def join(self, name_raw):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             name = sanitize_name(name_raw)
             name = self._unique_name_locked(name)
@@ -1079,6 +1468,9 @@ class MultiplayerState:
             }
             self.users_by_id[user_id] = user
             self.user_by_token[token] = user_id
+            self.users_by_last_seen[user_id] = user_id
+            self.names_casefold.add(name.casefold())
+            self._bump_lobby_locked()
             self._push_chat_locked(f"{name} joined the lobby.", system=True)
             lobby = self._serialize_lobby_locked(user)
             return {
@@ -1089,7 +1481,7 @@ class MultiplayerState:
             }
 
     def heartbeat(self, token):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
@@ -1097,7 +1489,7 @@ class MultiplayerState:
             return {"ok": True, "ts": int(time.time())}, None
 
     def leave(self, token):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
@@ -1105,16 +1497,20 @@ class MultiplayerState:
             self._remove_user_locked(user["id"], reason="left")
             return {"ok": True}, None
 
-    def lobby(self, token):
-        with self.lock:
+    def lobby(self, token, if_none_match=None):
+        """Return ``(payload, error, etag)``; ``payload`` is None if ``if_none_match`` is still current."""
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
-                return None, "Invalid session token."
-            return self._serialize_lobby_locked(user), None
+                return None, "Invalid session token.", None
+            etag = self.lobby_etag_locked(user)
+            if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+                return None, None, etag
+            return self._serialize_lobby_locked(user), None, etag
 
     def chat_send(self, token, text):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
@@ -1126,7 +1522,7 @@ class MultiplayerState:
             return {"ok": True}, None
 
     def invite(self, token, to_user_id):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
@@ -1144,12 +1540,8 @@ class MultiplayerState:
             if self._user_match_status_locked(other) != "available":
                 return None, "That player is unavailable."
 
-            for inv in self.invites.values():
-                if inv.get("status") != "pending":
-                    continue
-                pair = {inv.get("from_user_id"), inv.get("to_user_id")}
-                if pair == {user["id"], to_user_id}:
-                    return None, "There is already a pending invite between these players."
+            if frozenset((user["id"], to_user_id)) in self.pending_invite_by_pair:
+                return None, "There is already a pending invite between these players."
 
             invite = {
                 "id": self._new_invite_id(),
@@ -1162,11 +1554,12 @@ class MultiplayerState:
                 "responded_at": None,
             }
             self.invites[invite["id"]] = invite
+            self._add_pending_invite_locked(invite)
             self._push_chat_locked(f"{user['name']} invited {other['name']}.", system=True)
             return {"ok": True, "invite": self._serialize_invite_locked(invite)}, None
 
     def invite_respond(self, token, invite_id, action):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
@@ -1189,11 +1582,11 @@ class MultiplayerState:
             from_user = self.users_by_id.get(invite["from_user_id"])
             to_user = self.users_by_id.get(invite["to_user_id"])
             if not from_user or not to_user:
-                invite["status"] = "expired"
+                self._set_invite_status_locked(invite, "expired")
                 return None, "One of the users is no longer connected."
 
             if act == "decline":
-                invite["status"] = "declined"
+                self._set_invite_status_locked(invite, "declined")
                 self._push_chat_locked(
                     f"{to_user['name']} declined an invite from {from_user['name']}.",
                     system=True,
@@ -1201,21 +1594,21 @@ class MultiplayerState:
                 return {"ok": True, "invite": self._serialize_invite_locked(invite)}, None
 
             if self._user_match_status_locked(from_user) != "available":
-                invite["status"] = "expired"
+                self._set_invite_status_locked(invite, "expired")
                 return None, "Inviting player is no longer available."
             if self._user_match_status_locked(to_user) != "available":
-                invite["status"] = "expired"
+                self._set_invite_status_locked(invite, "expired")
                 return None, "You are currently unavailable."
 
-            invite["status"] = "accepted"
+            self._set_invite_status_locked(invite, "accepted")
 
-            for other_inv in self.invites.values():
-                if other_inv.get("status") != "pending":
-                    continue
-                pair = {other_inv.get("from_user_id"), other_inv.get("to_user_id")}
-                if from_user["id"] in pair or to_user["id"] in pair:
-                    other_inv["status"] = "canceled"
-                    other_inv["responded_at"] = time.time()
+            siblings = {}
+            for uid in (from_user["id"], to_user["id"]):
+                for other_inv in self._pending_invites_of_locked(uid):
+                    siblings[other_inv["id"]] = other_inv
+            for other_inv in siblings.values():
+                self._set_invite_status_locked(other_inv, "canceled")
+                other_inv["responded_at"] = time.time()
 
             match = self._new_match_locked(from_user["id"], to_user["id"])
             self._push_chat_locked(
@@ -1225,7 +1618,7 @@ class MultiplayerState:
             return {"ok": True, "match": self._serialize_match_locked(match, user)["match"]}, None
 
     def match_get(self, token):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
@@ -1237,16 +1630,19 @@ class MultiplayerState:
 
             match = self.matches.get(match_id)
             if not match:
+                self._bump_lobby_locked()
                 if user.get("match_id") == match_id:
                     user["match_id"] = None
                 if user.get("last_match_id") == match_id:
                     user["last_match_id"] = None
                 return {"ok": True, "match": None}, None
+            match_lock = self.match_locks[match_id]
 
-            return self._serialize_match_locked(match, user), None
+        with match_lock:
+            return self._serialize_match_bytes_locked(match, user), None
 
     def match_intent(self, token, x, y, rot_deg, meeple_feature_id, clear=False, locked=False):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
@@ -1262,10 +1658,14 @@ class MultiplayerState:
                 return None, "Match not found."
 
             player = match["user_to_player"].get(user["id"])
+            match_lock = self.match_locks[match_id]
+
+        with match_lock:
             if clear:
                 current_intent = match.get("turn_intent")
                 if not current_intent or current_intent.get("user_id") == user["id"]:
                     match["turn_intent"] = None
+                    self._touch_match_locked(match)
                 return self._serialize_match_locked(match, user), None
 
             if match.get("status") != "active":
@@ -1288,8 +1688,12 @@ class MultiplayerState:
             if rrot not in (0, 90, 180, 270):
                 return None, "Rotation must be one of 0, 90, 180, 270."
 
-            cell_key = self.engine.key_xy(rx, ry)
-            if cell_key in match["board"]:
+            # Unlocked intents are stored and echoed to both players even when the
+            # placement is illegal, so keep their coordinates on the board.
+            if not self.engine._within_bounds(rx, ry):
+                return None, "Out of board bounds."
+
+            if (rx, ry) in match["board"]:
                 return None, "Cell occupied."
 
             ok, reason = self.engine.can_place_at(match["board"], tile_id, rrot, rx, ry)
@@ -1304,17 +1708,15 @@ class MultiplayerState:
                     selected_meeple_feature = fid
 
             if selected_meeple_feature:
-                tile_rot = self.engine.rotate_tile(tile_id, rrot)
-                feature_by_id = {f.get("id"): f for f in (tile_rot.get("features") or [])}
-                feat = feature_by_id.get(selected_meeple_feature)
+                feat = self.engine.feature_by_id(tile_id, rrot).get(selected_meeple_feature)
                 if not feat:
                     return None, "Meeple feature id is invalid for the placed tile."
                 if feat.get("type") not in ("road", "city", "field", "cloister"):
                     return None, "Meeple cannot be placed on that feature type."
 
             match["turn_intent"] = {
-                "user_id": user["id"],
                 "player": int(player or 0),
+                "user_id": user["id"],
                 "tile_id": tile_id,
                 "x": rx,
                 "y": ry,
@@ -1323,10 +1725,11 @@ class MultiplayerState:
                 "locked": locked_intent,
                 "valid": bool(ok),
             }
+            self._touch_match_locked(match)
             return self._serialize_match_locked(match, user), None
 
     def match_submit_turn(self, token, x, y, rot_deg, meeple_feature_id):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
@@ -1340,106 +1743,99 @@ class MultiplayerState:
             if not match:
                 user["match_id"] = None
                 return None, "Match not found."
-            if match.get("status") != "active":
-                return None, "Match is not active."
-
-            player = match["user_to_player"].get(user["id"])
-            if player != match.get("turn_player"):
-                return None, "It is not your turn."
-
-            tile_id = match.get("current_tile")
-            if not tile_id:
-                return None, "No tile is currently assigned for this turn."
-
-            try:
-                rx = int(x)
-                ry = int(y)
-                rrot = int(rot_deg)
-            except Exception:
-                return None, "Invalid placement coordinates or rotation."
-
-            rrot = ((rrot % 360) + 360) % 360
-            if rrot not in (0, 90, 180, 270):
-                return None, "Rotation must be one of 0, 90, 180, 270."
-
-            ok, reason = self.engine.can_place_at(match["board"], tile_id, rrot, rx, ry)
-            if not ok:
-                return None, reason
-
-            cell_key = self.engine.key_xy(rx, ry)
-            inst_id = int(match["inst_seq"])
-            inst = {
-                "instId": inst_id,
-                "tileId": tile_id,
-                "rotDeg": rrot,
-                "meeples": [],
-            }
-            match["board"][cell_key] = inst
-            match["inst_seq"] = inst_id + 1
-
-            selected_meeple_feature = None
-            if meeple_feature_id is not None:
-                fid = str(meeple_feature_id).strip()
-                if fid:
-                    selected_meeple_feature = fid
-
-            if selected_meeple_feature:
-                if match["meeples_available"].get(player, 0) <= 0:
-                    match["board"].pop(cell_key, None)
-                    match["inst_seq"] = inst_id
-                    return None, "No meeples remaining for this player."
-
-                tile_rot = self.engine.rotate_tile(tile_id, rrot)
-                feature_by_id = {f.get("id"): f for f in (tile_rot.get("features") or [])}
-                feat = feature_by_id.get(selected_meeple_feature)
-                if not feat:
-                    match["board"].pop(cell_key, None)
-                    match["inst_seq"] = inst_id
-                    return None, "Meeple feature id is invalid for the placed tile."
-
-                if feat.get("type") not in ("road", "city", "field", "cloister"):
-                    match["board"].pop(cell_key, None)
-                    match["inst_seq"] = inst_id
-                    return None, "Meeple cannot be placed on that feature type."
-
-                analysis = self.engine.analyze_board(match["board"])
-                node_key = f"{inst_id}:{selected_meeple_feature}"
-                if node_key not in analysis["node_meta"]:
-                    match["board"].pop(cell_key, None)
-                    match["inst_seq"] = inst_id
-                    return None, "Failed to analyze selected feature."
-
-                gid = analysis["uf"].find(node_key)
-                group = analysis["groups"].get(gid)
-                if group:
-                    occ = group["meeples_by_player"].get(1, 0) + group["meeples_by_player"].get(2, 0)
+            with self.match_locks[match_id]:
+                if match.get("status") != "active":
+                    return None, "Match is not active."
+
+                player = match["user_to_player"].get(user["id"])
+                if player != match.get("turn_player"):
+                    return None, "It is not your turn."
+
+                tile_id = match.get("current_tile")
+                if not tile_id:
+                    return None, "No tile is currently assigned for this turn."
+
+                try:
+                    rx = int(x)
+                    ry = int(y)
+                    rrot = int(rot_deg)
+                except Exception:
+                    return None, "Invalid placement coordinates or rotation."
+
+                rrot = ((rrot % 360) + 360) % 360
+                if rrot not in (0, 90, 180, 270):
+                    return None, "Rotation must be one of 0, 90, 180, 270."
+
+                ok, reason = self.engine.can_place_at(match["board"], tile_id, rrot, rx, ry)
+                if not ok:
+                    return None, reason
+
+                cell_key = (rx, ry)
+                analysis = self._analysis_locked(match)
+
+                # Every check runs against the current board, so a rejected turn
+                # leaves nothing to roll back.
+                selected_meeple_feature = None
+                if meeple_feature_id is not None:
+                    fid = str(meeple_feature_id).strip()
+                    if fid:
+                        selected_meeple_feature = fid
+
+                if selected_meeple_feature:
+                    if match["meeples_available"][player] <= 0:
+                        return None, "No meeples remaining for this player."
+
+                    feat = self.engine.feature_by_id(tile_id, rrot).get(selected_meeple_feature)
+                    if not feat:
+                        return None, "Meeple feature id is invalid for the placed tile."
+
+                    if feat.get("type") not in ("road", "city", "field", "cloister"):
+                        return None, "Meeple cannot be placed on that feature type."
+
+                    occ = self.engine.occupancy_if_placed(analysis, cell_key, tile_id, rrot, selected_meeple_feature)
                     if occ > 0:
-                        match["board"].pop(cell_key, None)
-                        match["inst_seq"] = inst_id
                         return None, "Meeple rule: that connected feature is already occupied."
 
-                inst["meeples"].append({"player": player, "featureLocalId": selected_meeple_feature})
-                match["meeples_available"][player] = max(0, match["meeples_available"].get(player, 0) - 1)
-
-            self._recompute_and_score_locked(match)
-
-            next_player = 1 if player == 2 else 2
-            match["turn_player"] = next_player
-            match["turn_index"] = int(match.get("turn_index", 0)) + 1
-            match["current_tile"] = None
-            match["burned_turn"] = []
-            match["turn_intent"] = None
-            match["last_event"] = (
-                f"{user['name']} placed {tile_id} at ({rx},{ry}) r{rrot}"
-                + (f" + meeple {selected_meeple_feature}." if selected_meeple_feature else ".")
-            )
+                inst_id = int(match["inst_seq"])
+                inst = {
+                    "instId": inst_id,
+                    "tileId": tile_id,
+                    "rotDeg": rrot,
+                    "meeples": [],
+                }
+                match["board"][cell_key] = inst
+                match["board_version"] += 1
+                self._touch_match_locked(match)
+                match["inst_seq"] = inst_id + 1
+                self.engine.add_to_analysis(analysis, cell_key, inst)
+                match["analysis_version"] = match["board_version"]
+
+                if selected_meeple_feature:
+                    node_key = f"{inst_id}:{selected_meeple_feature}"
+                    inst["meeples"].append({"player": player, "featureLocalId": selected_meeple_feature})
+                    self.engine.adjust_meeples(analysis, node_key, player, 1)
+                    match["meeples_available"][player] = max(0, match["meeples_available"][player] - 1)
+
+                self.engine.extend_frontier(match["frontier"], match["board"], rx, ry)
+                self._recompute_and_score_locked(match, analysis=analysis, placed_cell=cell_key)
+
+                next_player = 1 if player == 2 else 2
+                match["turn_player"] = next_player
+                match["turn_index"] = int(match.get("turn_index", 0)) + 1
+                match["current_tile"] = None
+                match["burned_turn"] = []
+                match["turn_intent"] = None
+                match["last_event"] = (
+                    f"{user['name']} placed {tile_id} at ({rx},{ry}) r{rrot}"
+                    + (f" + meeple {selected_meeple_feature}." if selected_meeple_feature else ".")
+                )
 
-            self._draw_placeable_tile_for_match_locked(match)
+                self._draw_placeable_tile_for_match_locked(match)
 
-            return self._serialize_match_locked(match, user), None
+                return self._serialize_match_locked(match, user), None
 
     def match_resign(self, token):
-        with self.lock:
+        with self.lobby_lock:
             self._cleanup_locked()
             user = self._auth_user_locked(token)
             if not user:
@@ -1455,7 +1851,8 @@ class MultiplayerState:
                 return None, "Match not found."
 
             if match.get("status") == "active":
-                self._abort_match_locked(match_id, f"{user['name']} resigned.")
+                with self.match_locks[match_id]:
+                    self._abort_match_locked(match_id, f"{user['name']} resigned.")
                 self._push_chat_locked(
                     f"Match ended early: {user['name']} resigned.",
                     system=True,
@@ -1467,63 +1864,242 @@ class MultiplayerState:
 STATE = MultiplayerState(ROOT)
 
 
+# Static file path -> (mtime_ns, size, content_type, last_modified, body).
+_static_cache = {}
+
+
+@lru_cache(maxsize=256)
+def http_date_timestamp(value):
+    """Return the POSIX time of an HTTP date header value, or None if it is unusable.
+
+    Mirrors ``SimpleHTTPRequestHandler``: a value without a zone is taken as UTC,
+    any other zone or an ill-formed value is ignored.
+    """
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, IndexError, OverflowError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc).timestamp()
+    if parsed.tzinfo is not timezone.utc:
+        return None
+    return parsed.timestamp()
+
+
+def split_request_target(target):
+    """Split an origin-form request target into ``(path, query)``, dropping any fragment.
+
+    Cheaper than ``urlparse`` for the relative targets BaseHTTPRequestHandler sees.
+    """
+    hash_at = target.find("#")
+    if hash_at >= 0:
+        target = target[:hash_at]
+    query_at = target.find("?")
+    if query_at < 0:
+        return target, ""
+    return target[:query_at], target[query_at + 1 :]
+
+
+def token_from_query(query):
+    """Return the first ``token`` parameter of a query string, or ``""``.
+
+    Session tokens come from ``secrets.token_urlsafe`` and never need unquoting,
+    so this avoids building the full ``parse_qs`` dict on every poll.
+    """
+    if query.startswith("token="):
+        start = 6
+    else:
+        start = query.find("&token=")
+        if start < 0:
+            return ""
+        start += 7
+    end = query.find("&", start)
+    return query[start:] if end < 0 else query[start:end]
+
+
+@lru_cache(maxsize=64)
+def accepts_gzip(accept_encoding):
+    """Return True if an ``Accept-Encoding`` header value allows gzip.
+
+    An explicit ``gzip`` (or ``x-gzip``) entry wins over ``*``; ``q=0`` refuses it.
+    """
+    gzip_q = any_q = None
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "x-gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            any_q = q
+        else:
+            gzip_q = q
+    if gzip_q is None:
+        gzip_q = any_q
+    return gzip_q is not None and gzip_q > 0
+
+
 class CarcassonneHandler(SimpleHTTPRequestHandler):
+    # HTTP/1.0: one request per connection. Clients poll every ~1.2 s, so kept-alive
+    # connections would never go idle and each would pin a pool worker for as long
+    # as its tab stays open. The timeout stops a stalled client from holding one.
+    timeout = 5
+    # Responses are small single writes; don't let Nagle hold them for a delayed ACK.
+    disable_nagle_algorithm = True
+
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=str(ROOT), **kwargs)
-
-    def _write_json(self, payload, status=HTTPStatus.OK):
-        body = json.dumps(payload, indent=2).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json; charset=utf-8")
-        self.send_header("Content-Length", str(len(body)))
-        self.send_header("Cache-Control", "no-store")
+        super().__init__(*args, directory=_ROOT_STR, **kwargs)
+
+    def _write_json(self, payload, status=HTTPStatus.OK, etag=None, content_encoding=None, vary=None):
+        # Pre-encoded bodies (cached match polls) are sent as they are.
+        body = payload if isinstance(payload, bytes) else encode_json_compact(payload)
+        cache_headers = f"ETag: {etag}\r\nCache-Control: no-cache\r\n" if etag else "Cache-Control: no-store\r\n"
+        if content_encoding:
+            cache_headers += f"Content-Encoding: {content_encoding}\r\n"
+        if vary:
+            cache_headers += f"Vary: {vary}\r\n"
+        # Same headers send_response/send_header would produce, sent with the body in one write.
+        head = (
+            f"{self.protocol_version} {status.value} {status.phrase}\r\n"
+            f"Server: {self.version_string()}\r\n"
+            f"Date: {self.date_time_string()}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"{cache_headers}\r\n"
+        )
+        self.log_request(status.value)
+        self.wfile.write(head.encode("latin-1") + body)
+
+    def _write_not_modified(self, etag):
+        self.send_response(HTTPStatus.NOT_MODIFIED)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
         self.end_headers()
-        self.wfile.write(body)
+
+    def _serve_static_cached(self):
+        """Send a small static file from ``_static_cache``; return False to defer to the base class.
+
+        ``If-Modified-Since`` revalidations are answered from the cached mtime.
+        """
+        fs_path = self.translate_path(self.path)
+        if fs_path.endswith("/"):
+            fs_path += "index.html"
+        try:
+            st = os.stat(fs_path)
+        except OSError:
+            return False
+        cached = _static_cache.get(fs_path)
+        if cached is None or cached[:2] != (st.st_mtime_ns, st.st_size):
+            if st.st_size > STATIC_CACHE_MAX_FILE_BYTES or not os.path.isfile(fs_path):
+                return False
+            try:
+                with open(fs_path, "rb") as f:
+                    body = f.read()
+            except OSError:
+                return False
+            cached = (
+                st.st_mtime_ns,
+                st.st_size,
+                self.guess_type(fs_path),
+                self.date_time_string(st.st_mtime),
+                body,
+            )
+            _static_cache[fs_path] = cached
+        mtime_ns, _, ctype, last_modified, body = cached
+        ims = self.headers.get("If-Modified-Since")
+        if ims is not None and "If-None-Match" not in self.headers:
+            ims_ts = http_date_timestamp(ims)
+            # HTTP dates have whole-second precision.
+            if ims_ts is not None and mtime_ns // 1_000_000_000 <= ims_ts:
+                head = (
+                    f"{self.protocol_version} 304 Not Modified\r\n"
+                    f"Server: {self.version_string()}\r\n"
+                    f"Date: {self.date_time_string()}\r\n"
+                    f"Last-Modified: {last_modified}\r\n\r\n"
+                )
+                self.log_request(HTTPStatus.NOT_MODIFIED.value)
+                self.wfile.write(head.encode("latin-1"))
+                return True
+        head = (
+            f"{self.protocol_version} 200 OK\r\n"
+            f"Server: {self.version_string()}\r\n"
+            f"Date: {self.date_time_string()}\r\n"
+            f"Content-type: {ctype}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Last-Modified: {last_modified}\r\n\r\n"
+        )
+        self.log_request(HTTPStatus.OK.value)
+        self.wfile.write(head.encode("latin-1") + body)
+        return True
 
     def _read_json_body(self):
+        """Return ``(payload, error, status)`` for the request's JSON object body."""
         try:
             raw_len = self.headers.get("Content-Length", "0")
             content_len = int(raw_len)
         except ValueError:
-            return None, "Invalid Content-Length"
-
-        body = self.rfile.read(content_len)
+            content_len = -1
+        if content_len < 0:
+            return None, "Invalid Content-Length", HTTPStatus.BAD_REQUEST
+        if content_len > MAX_BODY_BYTES:
+            return None, "Payload too large", HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+        body = bytearray(content_len)
+        view = memoryview(body)
+        received = 0
+        while received < content_len:
+            n = self.rfile.readinto(view[received:])
+            if not n:
+                break
+            received += n
+        view.release()
+        if received < content_len:
+            del body[received:]
         try:
-            payload = json.loads(body.decode("utf-8"))
+            payload = decode_json(body)
         except json.JSONDecodeError:
-            return None, "Invalid JSON payload"
+            return None, "Invalid JSON payload", HTTPStatus.BAD_REQUEST
 
         if not isinstance(payload, dict):
-            return None, "Payload must be a JSON object"
-        return payload, None
+            return None, "Payload must be a JSON object", HTTPStatus.BAD_REQUEST
+        return payload, None, None
 
     def do_GET(self):
-        parsed = urlparse(self.path)
-        path = parsed.path
+        path, query = split_request_target(self.path)
 
         if path == "/api/overrides":
             try:
-                payload = load_overrides_file()
+                body, encoding = load_overrides_body(accepts_gzip(self.headers.get("Accept-Encoding", "")))
             except Exception as exc:  # pragma: no cover
                 self._write_json(
                     {"ok": False, "error": f"Failed to read overrides: {exc}"},
                     status=HTTPStatus.INTERNAL_SERVER_ERROR,
                 )
                 return
-            self._write_json(payload)
+            self._write_json(body, content_encoding=encoding, vary="Accept-Encoding")
             return
 
         if path == "/api/lobby":
-            token = (parse_qs(parsed.query).get("token") or [""])[0]
-            payload, err = STATE.lobby(token)
+            token = token_from_query(query)
+            payload, err, etag = STATE.lobby(token, self.headers.get("If-None-Match"))
             if err:
                 self._write_json({"ok": False, "error": err}, status=HTTPStatus.UNAUTHORIZED)
                 return
-            self._write_json(payload)
+            if payload is None:
+                self._write_not_modified(etag)
+                return
+            self._write_json(payload, etag=etag)
             return
 
         if path == "/api/match":
-            token = (parse_qs(parsed.query).get("token") or [""])[0]
+            token = token_from_query(query)
             payload, err = STATE.match_get(token)
             if err:
                 self._write_json({"ok": False, "error": err}, status=HTTPStatus.UNAUTHORIZED)
@@ -1531,16 +2107,17 @@ class CarcassonneHandler(SimpleHTTPRequestHandler):
             self._write_json(payload)
             return
 
+        if self._serve_static_cached():
+            return
         return super().do_GET()
 
     def do_POST(self):
-        parsed = urlparse(self.path)
-        path = parsed.path
+        path, _ = split_request_target(self.path)
 
         if path == "/api/overrides":
-            payload, err = self._read_json_body()
+            payload, err, code = self._read_json_body()
             if err:
-                self._write_json({"ok": False, "error": err}, status=HTTPStatus.BAD_REQUEST)
+                self._write_json({"ok": False, "error": err}, status=code)
                 return
             try:
                 write_overrides_file(payload)
@@ -1550,12 +2127,12 @@ class CarcassonneHandler(SimpleHTTPRequestHandler):
                     status=HTTPStatus.INTERNAL_SERVER_ERROR,
                 )
                 return
-            self._write_json({"ok": True, "file": OVERRIDES_FILE.name})
+            self._write_json(OVERRIDES_SAVED_BODY)
             return
 
-        payload, err = self._read_json_body()
+        payload, err, code = self._read_json_body()
         if err:
-            self._write_json({"ok": False, "error": err}, status=HTTPStatus.BAD_REQUEST)
+            self._write_json({"ok": False, "error": err}, status=code)
             return
 
         if path == "/api/session/join":
@@ -1650,19 +2227,95 @@ class CarcassonneHandler(SimpleHTTPRequestHandler):
         self._write_json({"ok": False, "error": "Not found"}, status=HTTPStatus.NOT_FOUND)
 
 
+class PooledHTTPServer(ThreadingHTTPServer):
+    """Threading server that hands requests to a fixed-size pool of daemon workers.
+
+    Workers are daemon threads so that Ctrl-C stops the process even while a
+    request is being served, as with the per-request threads of the base class.
+    """
+
+    request_queue_size = 64
+    # SO_REUSEADDR is inherited from HTTPServer. SO_REUSEPORT stays off: lobby and
+    # match state live in this process, so a second server must not share the port.
+    allow_reuse_port = False
+
+    def __init__(self, server_address, handler_class, max_workers: int | None = None):
+        super().__init__(server_address, handler_class)
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) * 4)
+        self._pending = queue.SimpleQueue()
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"http-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _worker_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            self.process_request_thread(*item)
+
+    def process_request(self, request, client_address):
+        self._pending.put((request, client_address))
+
+    def server_close(self):
+        super().server_close()
+        # Drop connections still waiting for a worker, then stop the idle workers.
+        while True:
+            try:
+                item = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self.shutdown_request(item[0])
+        for _ in self._workers:
+            self._pending.put(None)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Serve Carcassonne app with override + multiplayer APIs"
     )
     parser.add_argument("--host", default="127.0.0.1", help="Bind host (default: 127.0.0.1)")
     parser.add_argument("--port", type=int, default=8000, help="Bind port (default: 8000)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Requests handled at the same time; further connections wait in the queue until a "
+        "worker is free (default: 16)",
+    )
+    parser.add_argument(
+        "--unsafe-fast-writes",
+        action="store_true",
+        help="Overwrite the overrides file in place instead of via temp file + rename; "
+        "faster saves, but a crash mid-write can leave it truncated (fsync happens on shutdown only)",
+    )
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    global FAST_OVERRIDES_WRITES
+    FAST_OVERRIDES_WRITES = args.unsafe_fast_writes
 
-    server = ThreadingHTTPServer((args.host, args.port), CarcassonneHandler)
+    # Worker threads only run shallow request handlers, so they do not need the
+    # platform default stack (often 8 MiB each); set before any worker starts.
+    threading.stack_size(WORKER_STACK_SIZE)
+    server = PooledHTTPServer((args.host, args.port), CarcassonneHandler, max_workers=args.workers)
     print(f"Serving {ROOT} at http://{args.host}:{args.port}")
     print(f"Overrides file: {OVERRIDES_FILE}")
     print("Multiplayer API enabled: /api/session/*, /api/lobby, /api/chat, /api/invite/*, /api/match/* (including /api/match/intent)")
-    server.serve_forever()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if FAST_OVERRIDES_WRITES:
+            sync_overrides_file()
 
 
 if __name__ == "__main__":